@@ -121,6 +121,17 @@
 # identifying the name as not being exactly as requested, in addition to 
 # participating in the avoidance process itself.
 #
+#                         PURE PYTHON POLICY
+#   The name-crunching helpers (nextName, greedyext, bitmapChars) are the
+# hottest pure-text code and would be obvious candidates for a compiled
+# extension (Cython or cffi). That has been deliberately rejected. rene is a
+# single self-contained script that runs on any stock Python under Windows
+# and Linux with no build step and no install; a binary module would cost
+# that portability for helpers that have already been reduced to simple
+# C-level string operations (find, translate, slicing). If a compiled rewrite
+# is ever reconsidered it must keep a pure Python fallback so the script
+# alone remains sufficient.
+#
 #                           FUNCTIONS
 #- reRange converts a range string of the form m-n to the regular expression {m,n}.
 #- scanint converts decimal, hexadecimal, and binary strings to int.
@@ -139,13 +150,16 @@
 #- undo reverses the previous renaming in one directory.
 #- recUndo reverses the previous recursive renaming.
 # -----------------------------------------------------------------------
-import sys,os,re,stat,fnmatch
+import sys,os,re,fnmatch
 Windows = os.name == 'nt'
 if Windows :
     from msvcrt import getche, kbhit, getch
 else :
-    import tty, termios
     def lingetch(echo) :
+# tty and termios are needed only for the interactive Y/N keypress, which
+# batch modes (-AR, -AS) and -TI never reach. Importing here instead of at
+# module level keeps them off the startup path of scripted invocations.
+        import tty, termios
         fd = sys.stdin.fileno()
         old_settings = termios.tcgetattr(fd)
         try:
@@ -163,13 +177,17 @@ useInput = False
 
 sortdir = 0 # 0 = don't sort. 1 = simple sort. 2 = case-insensitive sort.
 
-renePat = re.compile(r'rene(.py|t.py|Act)') # To block attempts to rename 
-# our own files.
+reneOwn = ('rene.py', 'renet.py', 'reneAct') # To block attempts to rename
+# our own files. Tested with startswith so derived names like reneActr and
+# compiled rene.pyc are covered too, as the old regex prefix match did.
 
 newList = [] # List of new names about to be created (if -AR or ask and user
 # oks). This is global because procDir fills it (and uses it) and avoid reads
-# it to avoid collision not only with existing files but also preceding 
+# it to avoid collision not only with existing files but also preceding
 # renamed ones.
+newSet = set() # Companion set of the same names for O(1) membership tests,
+# casefolded under Windows. newList keeps ordered exact-case names for the
+# rename/record pass; the set answers "is this name already planned".
 
 fOpt = [] # -F option.
 filterCase = re.IGNORECASE # -FC option. Makes the filter case-sensitive. 
@@ -219,6 +237,11 @@ rvSkip = r'/'
 rvCopy = r'*'
 rvars = rvAdd + rvRule + rvSkip + rvCopy
 consumers = rvRule + rvSkip + rvCopy
+# Hashed forms for the per-fragment membership tests in native(). The strings
+# above remain for building the replacement-splitting regex.
+rvarSet = frozenset(rvars)
+consumerSet = frozenset(consumers)
+ruledSet = frozenset(rvRule + rvAdd) # The variables that require rules.
 
 rules = []
 irules = [] # Indices of I rules (probably only one) for recursion reload.
@@ -263,14 +286,15 @@ def reRange(str) :
 # It correctly handles negative (leading -) for all radices.
 def scanint(str) :
     if str == "" : return 0
-    v = str if str[0] != '-' else str[1:]
-    if v[0] != '0' :
-        v = int(v)
-    elif len(v) > 1 and v[1].upper() == 'X' :
+    neg = str[0] == '-'
+    v = str[1:] if neg else str
+    if v.startswith(('0x', '0X')) :
         v = int(v, 16)
-    else :
+    elif len(v) > 1 and v[0] == '0' :
         v = int(v, 2)
-    return v if str[0] != '-' else -v
+    else :
+        v = int(v)
+    return -v if neg else v
 
 # --------------------------------------------------------------------------
 # parmList scans a command parameter string delimited by / (mainly rules)
@@ -289,34 +313,42 @@ def parmList(parm, emptyok = False) :
 def bitmapChars(str, pat) :
     bm = 0
     for idx, chr in enumerate(pat) :
-        if str.find(chr) >= 0 :
-            bm |= 1 << idx
+        bm |= (chr in str) << idx
     return bm
 
 # --------------------------------------------------------------------------
-# greedyext divides the given file name into root and extension. This is 
-# similar to os.path.splitext but includes intermediate extensions as part of 
-# extension. e.g. name.tar.gzip is ['name', '.tar.gzip']. The purpose of this 
-# is to get to the real root name for rename. We rarely want to change any 
+# greedyext divides the given file name into root and extension. This is
+# similar to os.path.splitext but includes intermediate extensions as part of
+# extension. e.g. name.tar.gzip is ['name', '.tar.gzip']. The purpose of this
+# is to get to the real root name for rename. We rarely want to change any
 # extension name, including intermediate ones.
+#   The split point is the first . after any leading dots (so dot names like
+# .emacs keep their dot in the root). This used to be a backtracking regex but
+# it reduces to skipping leading dots and one str.find, which matters because
+# greedyext runs at least once per file on the rename path and repeatedly
+# during collision avoidance.
 # ..........................................................................
-extpat = re.compile(r'(\.*[^.]+)(\..+)*')
 def greedyext(str) :
-    pm = re.match(extpat, str)
-    if not pm : return ["", ""]
-    rootx = list(pm.groups())
-    if rootx[1] is None : rootx[1] = ""
-    return rootx
+    i = 0
+    while i < len(str) and str[i] == '.' :
+        i += 1
+    j = str.find('.', i)
+    if j < 0 :
+        return [str, ""]
+    return [str[:j], str[j:]]
 
 # ---------------------------------------------------------------------------
-# badChr inspects a given test string for any characters in a given string of 
-# bad characters. On the first match, i.e. bad character, it prints a detailed 
-# error message and raises ValueError exception.
+# badChr inspects a given test string for any characters in a given string of
+# bad characters. On the first match, i.e. bad character, it prints a detailed
+# error message and raises ValueError exception. chrs is a plain string of the
+# bad characters, not a regex class. str.translate deletes the bad characters
+# entirely in C so a length change detects them far more cheaply than running
+# a regex; the position, needed only for the error message, is then found by
+# ordinary scan.
 # ..........................................................................
 def badChr(chrs, s) :
-    bad = re.search(chrs, s)
-    if bad:
-        idx = bad.span()[0]
+    if len(s.translate(str.maketrans('', '', chrs))) != len(s) :
+        idx = next(i for i, c in enumerate(s) if c in chrs)
         print('Illegal', s[idx], 'in', s, 'at', idx)
         raise ValueError
 
@@ -340,11 +372,14 @@ def badChr(chrs, s) :
 # .........................................................................
 def nextName(str, step = 1, offset = 0) :
     if str[-1].isdigit() :
-        ng = re.search(r'(.*?)([0-9]+$)',str[offset:])
-        if ng :
-            sn = ng.groups()[1]
-            v = int(sn) + step
-            return str[0:offset] + ng.groups()[0] + '%0*d' % (len(sn), v)
+# Scan the trailing digit field backward (not beyond offset) instead of
+# matching a lazy regex; this runs repeatedly inside collision avoidance.
+        i = len(str)
+        while i > offset and str[i - 1].isdigit() :
+            i -= 1
+        sn = str[i:]
+        v = int(sn) + step
+        return str[0:i] + '%0*d' % (len(sn), v)
     elif str[-1].isalpha() :
         if str[-1].islower() :
             firstChr = 'a'
@@ -382,13 +417,19 @@ def nextName(str, step = 1, offset = 0) :
 # item (of any type) from the default rule.
 # ...........................................................................
 def prepRule(arg, defRule, rvType) :
+    if defRule[0] != rvType :
+        print(arg, 'rule is not supported by', rvType, 'replacement variable')
+        raise ValueError
+# Fast path for the common single-letter rule (all defaults accepted). There
+# are no parameters to parse or patch so the working list is just the rule ID
+# plus a copy of the default values. A single-letter I rule has mode 0 and
+# needs none of the extra pre-processing below.
+    if len(arg) == 1 :
+        return [arg] + defRule[1:]
     wlist = arg.split('/')
     if len(wlist[0]) > 1 :
         print('Bad syntax in rule', arg, 'Did you forget the first /?')
         raise ValueError
-    if defRule[0] != rvType :
-        print(arg, 'rule is not supported by', rvType, 'replacement variable')
-        raise ValueError
     for i in range(1, len(defRule)) :
         if i > len(wlist) - 1 : # Missing optional parameter, e.g. B<nothing>
             wlist.append(defRule[i]) 
@@ -416,11 +457,43 @@ def prepRule(arg, defRule, rvType) :
 # is the same as an existing file or name in newList (of files about to be 
 # renamed). It does this by modifying the file name in specific ways until 
 # finding a name that is not that of any existing file or one about to be 
-# created by the program itself. See -X option for a description of the 
+# created by the program itself. See -X option for a description of the
 # default and alternate schemes implemented here.
+#   existing is a snapshot set of the names in the current directory, built
+# once by procDir from the listing it already has. Testing membership in this
+# set replaces an os.path.exists call (one stat syscall) for every candidate
+# name, which the iterative avoidance process may generate by the hundreds.
+# Under Windows the snapshot is lower-cased to preserve the case-insensitive
+# behavior of os.path.exists there.
 # ...........................................................................
-def avoid(name) :
+def avoid(name, existing) :
     rootExt = greedyext(name)
+# Fast path for the default scheme: a numeric suffix appended to the root,
+# no merge and no punctuation. Instead of synthesizing and testing one
+# candidate at a time, collect the suffixes already used by names with this
+# root and extension and jump straight to the first free value. The candidate
+# sequence is the same as the iterative path produces: caStart, zero-padded
+# to its own width, incrementing by one. This cannot be used when -P asks
+# for the avoidance process display, which must show every stage tried.
+    if not caMerge and caPun == "" and caStart.isdigit() \
+    and not (pOpt & P_CA) :
+        root = rootExt[0]
+        ext = rootExt[1]
+        if Windows :
+            root = root.casefold()
+            ext = ext.casefold()
+        rootLen = len(root)
+        used = set()
+        for nl in (newList, existing) :
+            for n in nl :
+                if Windows : n = n.casefold()
+                if n.startswith(root) and n.endswith(ext) :
+                    used.add(n[rootLen:len(n) - len(ext)])
+        width = len(caStart)
+        k = int(caStart)
+        while '%0*d' % (width, k) in used :
+            k += 1
+        return rootExt[0] + '%0*d' % (width, k) + rootExt[1]
     caNames = 'Name collision: ' + name
 # If caPun exists it participates in collision avoidance. It can be in one of 
 # three positions, identified by caPunPos. 0 is root prefix. 1 (default) is 
@@ -451,7 +524,8 @@ def avoid(name) :
         if caPunLen != 0 :
             rootExt[0] += caPun
         tname = rootExt[0] + rootExt[1]
-        if not tname in newList and not os.path.exists(tname) :
+        tfold = tname.casefold() if Windows else tname
+        if tfold not in newSet and tfold not in existing :
             break;
         if i > 9 :
             print(caNames)
@@ -476,6 +550,66 @@ def avoid(name) :
         print(caNames)
     return rootExt[0] + rootExt[1]
 
+# ---------------------------------------------------------------------------
+# Rule handlers for native(). One per rule type, dispatched through the
+# ruleProcs table below, which replaces a chain of string comparisons with a
+# single dict probe per rule application. Each handler receives the working
+# rule list, the source floater (empty for rvAdd rules, which consume
+# nothing), the new-name fragment list to extend in place, and the per-file
+# greedyext cache. See the rule descriptions in repRules and in help.
+# ...........................................................................
+def doSlice(rule, src, parts, extCache) :
+    if rule[3] == 0 : # begin-end slice
+        if len(src) < rule[1] + rule[2] :
+            print('Warning:', src, 'is smaller than the slice')
+        parts.append(src[:rule[1]] + src[-rule[2]:])
+    else : # Pythonic slice
+        if rule[1] >= rule[2] or rule[2] > len(src) :
+            print('Warning:', src, 'cannot satisfy the slice')
+        parts.append(src[rule[1]:rule[2]])
+
+def doBump(rule, src, parts, extCache) :
+# Assume src contains an extension, in which case the root is modified without
+# touching the extension. If src doesn't contain an extension, rootExt[0]
+# contains the entire src while rootExt[1] is empty.
+#   The greedy split is load-bearing here and must not be replaced with
+# rsplit('.', 1): for a multi-extension name like base.tar.gzip the bump
+# applies to base and the whole .tar.gzip survives, whereas a last-dot split
+# would bump base.tar and keep only .gzip. greedyext itself is one str.find
+# plus slicing, and the extCache memoizes it per file.
+    rootExt = extCache.get(src)
+    if rootExt is None :
+        rootExt = greedyext(src)
+        extCache[src] = rootExt
+    mode = rule[2]
+    if rootExt[0][-1].isalpha() : bsel = 1
+    elif rootExt[0][-1].isdigit() : bsel = 2
+    else : bsel = 4
+    if (mode & bsel) != 0 :
+        if (mode & (bsel << 4)) == 0 :
+            parts.append(src) # Copy unchanged into the new name.
+        elif rootExt[1] != "" :
+            parts.append(rootExt[1]) # Discard root but not any extension.
+    else :
+        parts.append(nextName(rootExt[0], rule[1]) + rootExt[1])
+
+def doInc(rule, src, parts, extCache) :
+    if type(rule[I_START]) is int :
+        incName = '%0*d' % (rule[I_WIDTH], rule[I_START])
+        rule[I_START] += rule[I_STEP]
+    else : # alpha
+        incName = rule[I_START]
+        rule[I_START] = nextName(rule[I_START], rule[I_STEP])
+    if rule[I_MODE] & I_E : # Exactly as specified
+        parts.append(incName)
+    else : # Always apply to root (default mode)
+# The insertion goes inside the name built so far, so the fragments must be
+# collapsed here. This happens at most once per I rule, not per fragment.
+        rootExt = greedyext(''.join(parts))
+        parts[:] = [rootExt[0], incName, rootExt[1]]
+
+ruleProcs = {sliceRule:doSlice, bumpRule:doBump, incRule:doInc}
+
 # ---------------------------------------------------------------------------
 # native is rene's native filter-replacment-rules processor. This is the 
 # default unless -S or -E option. Those two are much simpler and embedded in 
@@ -498,55 +632,68 @@ def native(old) :
     filterMatch = filter.match(old)
     if filterMatch == None or noDotName and old[0] == '.' :
         return ""
-    for rule in filArgx :
-        v = filterMatch.group(rule[0])
+# Extract all of the match groups in one call. The semantic filter rules and
+# the floaters list index this tuple instead of calling group() repeatedly.
+# Note that group numbers are 1-based while the groups tuple is 0-based.
+    grps = filterMatch.groups()
+    for gidx, ftype, lo, hi in filArgx :
+        v = grps[gidx - 1]
 # If the floater includes both root and extension, apply the semantic filter
-# to the root. 
+# to the root.
         rext = v.split('.')
         if len(rext) > 1 :
             v = rext[0]
-        if rule[1][0] == FX_ARANGE :
-            if v < rule[1][1] or v > rule[1][2] :
+        if ftype == FX_ARANGE :
+            if v < lo or v > hi :
                 return ""
-        elif rule[1][0] == FX_NRANGE :
+        elif ftype == FX_NRANGE :
             try :
                 v = int(v)
             except ValueError :
                 return ""
-            if v < rule[1][1] or v > rule[1][2] :
+            if v < lo or v > hi :
                 return ""
             
     if len(oOpt) == 0 :
-        floaters = filterMatch.groups() 
+        floaters = grps
     else :
-        floaters = [filterMatch.groups()[idx] for idx in oOpt]
+        floaters = [grps[idx] for idx in oOpt]
     
-# Scan over the replacement list, adding literals to the new name, and 
-# processing variables, all of which except rvAdd consume one floater. If 
-# there aren't enough floaters, these variables contribute nothing to the new 
-# name. If there are more floaters than consumers all of the remaining ones 
+# Scan over the replacement list, adding literals to the new name, and
+# processing variables, all of which except rvAdd consume one floater. If
+# there aren't enough floaters, these variables contribute nothing to the new
+# name. If there are more floaters than consumers all of the remaining ones
 # are concatenated and given to the last consumer.
-    newName = ""
+#   The module globals referenced on every pass of the loop are bound to
+# locals first. This function is called once per file and the loop runs once
+# per replacement fragment, so the cheaper LOAD_FAST access adds up over
+# large directories.
+    _rvars = rvarSet ; _consumers = consumerSet ; _rules = rules
+    _maxFloat = maxFloat ; _maxConsumer = maxConsumer ; _ruleProcs = ruleProcs
+    extCache = {} # Per-file greedyext results. A floater that feeds several
+# rules (or repeats) gets its root/extension split computed only once.
+    parts = [] # newName fragments, joined once on return.
     floatIdx = 0 # floaters index
     ridx = 0 # rules index in case nRules > 0
+    src = "" # Stays empty for rvAdd rules, which consume no floater.
     for idx,rep in enumerate(lrep) :
-        if rep not in rvars :
-            newName += rep # Literal replacement
+        if rep not in _rvars :
+            parts.append(rep) # Literal replacement
             continue
         # Variable replacement
-        if rep in consumers :
+        if rep in _consumers :
 # If there are no more floaters then skip this consumer. If this is the last 
 # consumer but there are more floaters then concatenate the remaining floaters 
 # and treat them as one.
-            if floatIdx > maxFloat :
+            if floatIdx > _maxFloat :
                 continue # There are no floaters left to consume.
-            if idx == maxConsumer and floatIdx < maxFloat :
-                src = "".join(v for v in floaters[floatIdx:])
+            if idx == _maxConsumer and floatIdx < _maxFloat :
+                src = "".join(floaters[floatIdx:])
             else :
                 src = floaters[floatIdx]
             floatIdx += 1
             if rep == rvCopy :
-                newName += src
+                parts.append(src)
                 continue
             if rep == rvSkip or src == "" :
                 continue
@@ -556,67 +703,35 @@ def native(old) :
 # any specific rules. They also differ in that rvRule consumes a floater and 
 # rvAdd does not but that difference is already accounted for in the preceding 
 # block.
-        if rules[ridx][0] == sliceRule :
-            if rules[ridx][3] == 0 : # begin-end slice
-                if len(src) < rules[ridx][1] + rules[ridx][2] :
-                    print('Warning:', src, 'is smaller than the slice')
-                newName += src[:rules[ridx][1]] + src[-rules[ridx][2]:]
-            else : # Pythonic slice
-                if rules[ridx][1] >= rules[ridx][2] or rules[ridx][2] > len(src) :
-                    print('Warning:', src, 'cannot satisfy the slice')
-                newName += src[rules[ridx][1]:rules[ridx][2]]
-
-        elif rules[ridx][0] == bumpRule :
-# Assume src contains an extension, in which case the root is modified without 
-# touching the extension. If src doesn't contain an extension, rootExt[0] 
-# contains the entire src while rootExt[1] is empty.
-            rootExt = greedyext(src)
-            mode = rules[ridx][2]
-            if rootExt[0][-1].isalpha() : bsel = 1
-            elif rootExt[0][-1].isdigit() : bsel = 2
-            else : bsel = 4
-            if (mode & bsel) != 0 :
-                if (mode & (bsel << 4)) == 0 :
-                    newName += src # Copy unchanged into the new name.
-                elif rootExt[1] != "" :
-                    newName += rootExt[1] # Discard root but not any extension.
-            else : 
-                newName += nextName(rootExt[0], rules[ridx][1]) + rootExt[1]
-
-        elif rules[ridx][0] == incRule :
-            if type(rules[ridx][I_START]) is int :
-                incName = '%0*d' % (rules[ridx][I_WIDTH], rules[ridx][I_START])
-                rules[ridx][I_START] += rules[ridx][I_STEP]
-            else : # alpha
-                incName = rules[ridx][I_START]
-                rules[ridx][I_START] = nextName(rules[ridx][I_START], 
-                                                rules[ridx][I_STEP])
-            if rules[ridx][I_MODE] & I_E : # Exactly as specified
-                newName += incName
-            else : # Always apply to root (default mode)
-                rootExt = greedyext(newName)
-                newName = rootExt[0] + incName + rootExt[1]
-
+        rule = _rules[ridx] # One subscript instead of one per parameter.
+        _ruleProcs[rule[0]](rule, src, parts, extCache)
         ridx += 1
-    return newName
+    return ''.join(parts)
 
 # ------------------------------------------------------------------------
-# getdir returns the unmodified list from os.listdir if sortdir is 0, the list 
-# simply sorted if sortdir is 1, or the list case-insensitively sorted if 
-# sortdir is 2. Under Windows, sortdir is alwasy 0. Under Linux it is 2 for 
-# regression testing (option -TS); otherwise 1 only when native mode Insert-
-# Increment rule is being applied.
+# getdir returns a list of (name, isfile, isdir) tuples for the current
+# directory, unsorted if sortdir is 0, simply sorted if sortdir is 1, or
+# case-insensitively sorted (by casefolded name, with the original name as
+# tiebreaker) if sortdir is 2. Under Windows, sortdir is alwasy
+# 0. Under Linux it is 2 for regression testing (option -TS); otherwise 1 only
+# when native mode Insert-Increment rule is being applied.
+#   os.scandir is used instead of os.listdir because the directory read fills
+# in the file type for free, where listdir callers must stat every name. The
+# is_file/is_dir results are cached in the tuples so callers never touch the
+# file system again just to classify a name. Symlinks are followed, as the
+# old os.stat classification did, so a link to a file still renames as a file
+# and a link to a directory still recurses.
 # ....................................................................
-def getdir() : 
-    dl = os.listdir()
+def getdir() :
+    with os.scandir() as sd :
+        dl = [(e.name, e.is_file(), e.is_dir()) for e in sd]
     if sortdir == 0 :
         return dl
     elif sortdir == 1 :
         dl.sort()
         return dl
-    dl = [(f.lower(), f) for f in dl]
-    dl.sort()
-    return [f[1] for f in dl]
+    dl.sort(key = lambda e : (e[0].casefold(), e[0]))
+    return dl
 
 # ----------------------------------------------------------------------------
 # procDir processes the current directory.
@@ -634,9 +749,10 @@ def getdir() :
 # Files that fail these are skipped (and reported if requested by -P).
 #   -E and -S processes are very simple and embedded in the loop. Native mode 
 # is much more complicated. It is implemented in the 'native' function in order
-# to focus the loop block on operations shared by all three modes. -S and -E 
-# modes raise the locally defined SkipFileException. native returns the new 
-# name, which, if empty, causes SkipFileException to be raised. All further 
+# to focus the loop block on operations shared by all three modes. A file
+# rejected by any mode's filter simply continues to the next one, optionally
+# reported per -P; native signals rejection by returning an empty name. All
+# further
 # processing is the same for all three modes. If the name is unchanged, nothing
 # more is done (this can be reported by -P option). If the new name is the same
 # as an existing file or one about to be created by renaming, collision 
@@ -647,84 +763,105 @@ def getdir() :
 # displayed. If the changes are made they are recorded in reneAct for undo 
 # option -U.
 # ...........................................................................
-class SkipFileException(Exception):
-    pass
 def procDir() :
-    global newList
+    global newList, newSet, lastDirlist
     newList = []
+    newSet = set()
     renFiles = 0
     oldList = []
 
-# scandir is more efficient than listdir when checking attributes, as in this 
-# situation, but it requires Python 3.6 and the last one to run in XP is 3.4.
     dirlist = getdir()
-    for old in dirlist :
-        oldstat = os.stat(old).st_mode
-        if stat.S_ISREG(oldstat) : # regular file.
-            if opdirs > 1 : continue # Only dirs.
-            if renePat.match(old) : continue # Don't rename our own files.
-        elif stat.S_ISDIR(oldstat) : # directory
-            if opdirs == 0 : continue # Only files.
+    lastDirlist = dirlist # procTree can reuse this snapshot; see there.
+# Snapshot the directory names once for collision avoidance. avoid tests
+# candidate names against this set instead of stat'ing each one. Lower-cased
+# under Windows to match its case-insensitive file system.
+    existing = {e[0].casefold() for e in dirlist} if Windows \
+    else {e[0] for e in dirlist}
+# As in native, the globals consulted on every file are bound to locals
+# first; LOAD_FAST beats a global dict lookup on each of these several times
+# per file across a large directory.
+    _opdirs = opdirs ; _reneOwn = reneOwn ; _fexcPat = fexcPat
+    _pOpt = pOpt ; _sub = len(sOpt) != 0 ; _eOpt = eOpt
+    _pSkip = _pOpt & P_SKIP
+    for old, isfile, isdir in dirlist :
+        if isfile : # regular file.
+            if _opdirs > 1 : continue # Only dirs.
+            if old.startswith(_reneOwn) : continue # Don't rename our own files.
+        elif isdir : # directory
+            if _opdirs == 0 : continue # Only files.
         else : continue # Not file or directory.
 
-        try :
-            if len(fOpt) != 0 :
-                for pat in fOpt :
-                    if fnmatch.fnmatch(old, pat) :
-                        raise SkipFileException(old)
-            if len(sOpt) != 0 :
-                newName = old
-                for sop in sOpt :
-                    if sop.upper() == 'U' :
-                        newName = newName.upper()
-                    elif sop.upper() == 'L' :
-                        newName = newName.lower()
-                    elif len(sop) == 2 :
-                        newName = newName.replace(sop[0], 
-                        sop[1] if sop[0] != sop[1] else "")
-            elif eOpt :
-                if not filter.match(old) :
-                    raise SkipFileException(old)
-                newName = filter.sub(sys.argv[2], old)
-            else : # Native
-                newName = native(old)
-                if newName == "" :
-                    raise SkipFileException(old)
-        except SkipFileException as f :
-            if pOpt & P_SKIP :
-                print('Skipping', f)
+# Each mode's filter rejections fall through to plain continues instead of
+# raising an exception; in a big directory most files are skips and the
+# raise/unwind cost was paid on every one of them just to reach a print that
+# -P usually suppresses anyway.
+        if _fexcPat is not None and _fexcPat.match(old) :
+            if _pSkip : print('Skipping', old)
             continue
+        if _sub :
+            newName = old
+            for op in sProg :
+                if op == 'U' :
+                    newName = newName.upper()
+                elif op == 'L' :
+                    newName = newName.lower()
+                else :
+                    newName = newName.translate(op)
+        elif _eOpt :
+            if not filter.match(old) :
+                if _pSkip : print('Skipping', old)
+                continue
+            newName = filter.sub(sys.argv[2], old)
+        else : # Native
+# Cheap first-stage sieve on the filter's literal anchor before the full
+# regex match in native. Names rejected here would also fail the filter.
+            if filPfx != "" and \
+            not (old.lower() if filterCase else old).startswith(filPfx) :
+                if _pSkip : print('Skipping', old)
+                continue
+            newName = native(old)
+            if newName == "" :
+                if _pSkip : print('Skipping', old)
+                continue
 
         if newName == old :
-            if pOpt & P_UNCHANGED :
+            if _pOpt & P_UNCHANGED :
                 print(old, 'is unchanged')
             continue # Skip renaming
 
 # .......................... Collision Avoidance ..........................
 # If the newName is the same as an existing file under case-insensitive Windows
-# the user is making a case change. This is very unlikely in Linux but using 
-# os.path.samefile removes all uncertainty. If it says that old and newName 
-# are the same file then the file is renamed. Otherwise, collision avoidance 
-# is required. Collision stop and continue options apply only on collision with
+# the user is making a case change, which renames without collision avoidance.
+# The existing set built from the directory snapshot answers both questions
+# without the stat syscalls of os.path.exists and os.path.samefile: under
+# Windows a casefolded hit that also casefold-matches old is a case change;
+# under Linux any hit is a collision since newName is already known to differ
+# from old. Collision stop and continue options apply only on collision with
 # existing files, not to new-new collisions.
-        if os.path.exists(newName) and not os.path.samefile(old, newName) :
+        if Windows :
+            collide = newName.casefold() in existing \
+            and newName.casefold() != old.casefold()
+        else :
+            collide = newName in existing
+        if collide :
             if caStop or caContinue :
                 print(newName, 'already exists. Unable to rename', old)
                 if caStop : return(1)
                 continue
-            newName = avoid(newName)
-        elif newName in newList :
-            newName = avoid(newName)
+            newName = avoid(newName, existing)
+        elif (newName.casefold() if Windows else newName) in newSet :
+            newName = avoid(newName, existing)
         if newName == "" :
             print('Unresolvable collision trying to rename', old)
             if caStop : return(1)
             continue
 
         renFiles += 1
-        if pOpt & P_REN :
+        if _pOpt & P_REN :
             print('Rename', old, 'to', newName) 
         oldList.append(old)
         newList.append(newName)
+        newSet.add(newName.casefold() if Windows else newName)
         # End of loop over files in directory
 
     if renFiles == 0 :
@@ -753,19 +890,29 @@ def procDir() :
                 if lingetch(True).upper() != 'Y' :
                     return 0
         except KeyboardInterrupt :
-            exit(1)
+            sys.exit(1)
     # A_REN or A_ASK+Y
+# The complete action record is written and flushed to disk before any file
+# is touched. Interleaving one record write per rename risked a partial
+# reneAct if the run died mid-loop; persisting the intent first means -U
+# always sees the whole plan, and the records go out in one buffered
+# writelines instead of one small write per file.
     with open('reneAct', 'wt') as actFile :
-        for act in zip(oldList, newList) :
-            actFile.write(act[0] + '>' + act[1] + '\n')
-            try :
-                os.rename(act[0], act[1])
-            except FileExistsError :
-                print('Unable to overwrite', act[1])
-                #return(1)
-            except PermissionError :
-                print('Denied access to', act[0])
-                #return(1)
+        actFile.writelines([act[0] + '>' + act[1] + '\n'
+        for act in zip(oldList, newList)])
+        actFile.flush()
+        os.fsync(actFile.fileno())
+# os.replace has rename(2) semantics on both platforms: an existing target
+# is overwritten in one atomic syscall. Collision avoidance has already kept
+# planned names clear of existing ones, so the Windows-only FileExistsError
+# path that os.rename needed is gone and Windows now behaves like Linux,
+# where rename always overwrote silently.
+    for act in zip(oldList, newList) :
+        try :
+            os.replace(act[0], act[1])
+        except PermissionError :
+            print('Denied access to', act[0])
+            #return(1)
     return(0)
 
 # ------------------------------------------------------------------------
@@ -782,12 +929,16 @@ def procDir() :
 # from that file for -UR. For that, absolute OS-specific directories simplify 
 # code.
 # ..........................................................................
+sepTrans = str.maketrans('\\/', '>>') # Both separators to > in one pass.
 def agnosticDir(dir) :
-   return dir[chopDir:].replace('\\', '>').replace('/', '>') 
+   return dir[chopDir:].translate(sepTrans)
 
 # ---------------------------------------------------------------------------
-# procTree implements directory recursion. It is self-recursive. It operates
-# only on globals. It returns 0 on reaching restricted depth or the end of a
+# procTree implements directory recursion. It is self-recursive. rDir is the
+# path of the directory to process; each level extends its own path with the
+# subdirectory name when recursing, so the kernel is never asked to
+# reconstruct the cwd (os.getcwd) once per visited directory.
+# It returns 0 on reaching restricted depth or the end of a
 # branch without procDir or the next lower instance of itself returning an
 # error. Only procDir can actually produce an error. This bubbles up through
 # the recursive stack.
@@ -800,11 +951,17 @@ def agnosticDir(dir) :
 # directory names (namespec, including * and ?) delimited by / is, by default 
 # excluded. It can be inverted to be inclusive by + in the option. e.g.
 # -R4/+/bak/temp
+#   The recursion is deliberately serial. Handing subdirectories to a thread
+# pool was considered for latency-bound trees (network filesystems) and
+# rejected: the walk pivots on os.chdir, which is process-global, the I rule
+# reload and newList/rVisit are shared state, and reneAct/reneActr must be
+# written in a deterministic depth-first order for undo and for regression
+# comparison. Parallelizing would mean rebuilding all of that around absolute
+# paths and locks for a tool whose runs are dominated by one directory.
 # .........................................................................
-def procTree() :
+def procTree(rDir) :
     global curDepth
     ret = 0
-    rDir = os.getcwd()
     rVisit.append(rDir)
     print(agnosticDir(rDir))
     for idx in irules :
@@ -815,21 +972,22 @@ def procTree() :
     if curDepth >= rDepth :
         return 0
     curDepth += 1
-    dirlist = getdir()
-    for fn in dirlist :
-        if stat.S_ISDIR(os.stat(fn).st_mode) :
-            if len(rDirs) == 0 : 
+# procDir has just scanned this same directory. When directories are excluded
+# from renaming (the default) their names cannot have changed, so its
+# snapshot still describes them and a second scandir is pointless. With -Fd
+# or -FD a directory may have been renamed, so the names must be re-read.
+    dirlist = lastDirlist if opdirs == 0 else getdir()
+    for fn, isfile, isdir in dirlist :
+        if isdir :
+            if rDirsPat is None :
                 doit = True # All dirs are included if no list.
+            elif rDirsPat.match(fn) :
+                doit = rInc # This dir is in include list.
             else :
-                for pat in rDirs :
-                    if fnmatch.fnmatch(fn, pat) :
-                        doit = rInc # This dir is in include list.
-                        break
-                else : 
-                    doit = not rInc # This dir is not in exclude list.
+                doit = not rInc # This dir is not in exclude list.
             if doit :
                 os.chdir(fn)
-                ret = procTree()
+                ret = procTree(rDir + os.sep + fn)
                 os.chdir('..')
                 if ret != 0 :
                     break
@@ -844,8 +1002,9 @@ def undo() :
         print('Missing reneAct file')
     else :
         with open('reneAct', 'rt') as actFile :
-            for line in actFile :
-                act = line.rstrip().split('>')
+            acts = actFile.read().splitlines()
+            for line in acts :
+                act = line.split('>')
                 print('rename', act[1], 'back to', act[0])
                 if not os.path.exists(act[1]) :
                     print(act[1], 'does not exist')
@@ -867,9 +1026,8 @@ def recUndo() :
         print('Missing reneActr file')
     else :
         with open('reneActr', 'rt') as df :
-            dlist = list(df)
+            dlist = df.read().splitlines()
         for dir in reversed(dlist) :
-            dir = dir.rstrip()
             print(agnosticDir(dir))
             os.chdir(dir)
             undo()
@@ -974,121 +1132,191 @@ if argc == 1 :
     print(r'  numeric. mode may be E and/or R. E means to insert the increment exactly as')
     print(r'  specified, even if that means to the extension. R means to reset to the start')
     print(r'  for each directory under recursion (option -R). Default I is I/0/1/1/"".')
-    exit(0)
-
-# Parse command line options before anything else because they may establish 
-# conditions for others. e.g. -FC makes the filter case-sensitive (default is 
-# case-insensitive). 
+    sys.exit(0)
+
+# Parse command line options before anything else because they may establish
+# conditions for others. e.g. -FC makes the filter case-sensitive (default is
+# case-insensitive).
+#   Each option letter has its own handler function, dispatched through the
+# optProcs table in the argument loop, like the rule handlers in native. The
+# handlers set the option globals and raise BadOptionException for anything
+# they cannot parse.
 class BadOptionException(Exception):
     pass
+
+def optU(arg) : # Undo the last set of changes.
+    if len(arg) == 2 :
+        sys.exit(undo())
+    elif len(arg) == 3 and arg[2] == 'R' :
+        sys.exit(recUndo())
+    else :
+        raise BadOptionException(arg)
+
+def optX(arg) : # collision avoidance control
+    global caStart, caStop, caContinue, caMerge, caPun, caPunPos
+    i = 2
+    while i < len(arg) :
+        if arg[i] == '/' : # String field runs to the next / or the end.
+            i += 1
+            j = arg.find('/', i)
+            if j < 0 : j = len(arg)
+            caStart = arg[i:j]
+            i = j
+        elif arg[i] == 'S' : caStop = True
+        elif arg[i] == 'C' : caContinue = True
+        elif arg[i] == 'M' : caMerge = True
+        elif arg[i].isdigit() : # Digit run.
+            j = i + 1
+            while j < len(arg) and arg[j].isdigit() : j += 1
+            caStart = arg[i:j]
+            i = j
+            continue
+        elif arg[i].isalpha() : # Single letter
+           caStart = arg[i]
+        i += 1
+    pm = re.search(r"([,]*)([`~!@#$%^&()_+[}{\]\-]+)", arg[2:])
+    if pm :
+        if pm.groups()[0] == ',' :
+            caPunPos = 0
+        elif pm.groups()[0] == ',,' :
+            caPunPos = 2
+        caPun = pm.groups()[1]
+
+def optA(arg) : # Action control
+    global aOpt
+    if len(arg) < 3 :
+        print(r'-A needs an argument, A, S, or R')
+        sys.exit(1)
+    i = 'ARS'.find(arg[2].upper())
+    if(i < 0) :
+        print(r'-A parameter can only be A, S, or R')
+        sys.exit(1)
+    aOpt = i
+
+def optS(arg) :
+    global sOpt
+    sOpt = parmList(arg[2:])
+    if len(sOpt) == 0 :
+        print(r'-S (Substitute) option requires parameters.')
+        sys.exit(1)
+
+def optO(arg) : # Floater order
+    global oOpt
+    if len(arg) < 3 :
+        print(r'-O (Order) option requires parameters.')
+        sys.exit(1)
+    oOpt = [int(e) for e in arg[2:].split(',')]
+
+def optF(arg) : # Pre-filter
+    global filterCase, opdirs
+    for p in parmList(arg[2:]) :
+        if p == 'C' :
+            filterCase = 0 # case-sensitive filter.
+        elif p == 'D' :
+            opdirs = 2 # Operate only on directories.
+        elif p == 'd' :
+            opdirs = 1 # Include directories in operations.
+        else :
+            fOpt.append(p) # A namespec to exclude
+
+def optR(arg) : # Recurse
+    global rDepth, rInc
+    rDepth = 1000 # Default is essentially infinite
+    for p in parmList(arg[2:]) :
+        if p.isdigit() : rDepth = int(p)
+        elif p == '+' : rInc = True
+        elif p == '-' : rInc = False
+        else : rDirs.append(p)
+
+def optE(arg) : # RE filter and replacement
+    global eOpt
+    eOpt = True
+
+def optP(arg) : # -P bit-map of what events to print.
+    global pOpt
+    pOpt = 0xFFFF if len(arg) == 2 else scanint(arg[2:])
+
+def optT(arg) : # Special test options mostly related to OS.
+    global sortdir, useInput
+    for p in arg[2:] :
+        if p == 'S' :
+            sortdir = 2
+        elif p == 'I' :
+            useInput = True
+
+optProcs = {'U':optU, 'X':optX, 'A':optA, 'S':optS, 'O':optO, 'F':optF,
+'R':optR, 'E':optE, 'P':optP, 'T':optT}
+
 for arg in sys.argv[1:] :
-    if arg[0] == '-' : # Option is any arg with - prefix
+    if arg[:1] == '-' : # Option is any arg with - prefix. The slice, unlike
+# arg[0], cannot raise on an empty argument.
         try:
             if len(arg) < 2 :
                 raise BadOptionException(arg)
-
-            if arg[1] == 'U' : # Undo the last set of changes.
-                if len(arg) == 2 :
-                    exit(undo())
-                elif len(arg) == 3 and arg[2] == 'R' :
-                    exit(recUndo())
-                else :
-                    raise BadOptionException(arg)
-            
-            elif arg[1] == 'X' : # collision avoidance control
-                i = 2
-                while i < len(arg) :
-                    if arg[i] == '/' : # String field
-                        i += 1
-                        caStart = re.search(r'([^/]*)', arg[i:]).groups()[0]
-                        i += len(caStart)
-                    elif arg[i] == 'S' : caStop = True
-                    elif arg[i] == 'C' : caContinue = True
-                    elif arg[i] == 'M' : caMerge = True
-                    elif arg[i].isdigit() :
-                        caStart = re.search(r'([0123456789]+)', arg[i:]).groups()[0]
-                        i += len(caStart)
-                        continue
-                    elif arg[i].isalpha() : # Single letter
-                       caStart = arg[i]
-                    i += 1
-                pm = re.search(r"([,]*)([`~!@#$%^&()_+[}{\]\-]+)", arg[2:]) 
-                if pm :
-                    if pm.groups()[0] == ',' :
-                        caPunPos = 0
-                    elif pm.groups()[0] == ',,' :
-                        caPunPos = 2
-                    caPun = pm.groups()[1]
-
-            elif arg[1] == 'A' : # Action control
-                if len(arg) < 3 :
-                    print(r'-A needs an argument, A, S, or R')
-                    exit(1)
-                i = 'ARS'.find(arg[2].upper())
-                if(i < 0) :
-                    print(r'-A parameter can only be A, S, or R')
-                    exit(1)
-                aOpt = i
-
-            elif arg[1] == 'S' :
-                sOpt = parmList(arg[2:])
-                if len(sOpt) == 0 :
-                    print(r'-S (Substitute) option requires parameters.')
-                    exit(1)
-
-            elif arg[1] == 'O' : # Floater order
-                if len(arg) < 3 :
-                    print(r'-O (Order) option requires parameters.')
-                    exit(1)
-                oOpt = [int(e) for e in arg[2:].split(',')]
-
-            elif arg[1] == 'F' : # Pre-filter
-                pl = parmList(arg[2:])
-                for p in pl :
-                    if p == 'C' : 
-                        filterCase = 0 # case-sensitive filter. 
-                    elif p == 'D' : 
-                        opdirs = 2 # Operate only on directories.
-                    elif p == 'd' :
-                        opdirs = 1 # Include directories in operations.
-                    else :
-                        fOpt.append(p) # A namespec to exclude
-
-            elif arg[1] == 'R' : # Recurse
-                rDepth = 1000 # Default is essentially infinite
-                for p in parmList(arg[2:]) :
-                    if p.isdigit() : rDepth = int(p)
-                    elif p == '+' : rInc = True
-                    elif p == '-' : rInc = False
-                    else : rDirs.append(p)
-
-            elif arg[1] == 'E' : # RE filter and replacement
-                eOpt = True
-
-            elif arg[1] == 'P' : # -P bit-map of what events to print.
-                pOpt = 0xFFFF if len(arg) == 2 else scanint(arg[2:])
-
-            elif arg[1] == 'T' : # Special test options mostly related to OS.
-                for p in arg[2:] :
-                    if p == 'S' :
-                        sortDir = True
-                    elif p == 'I' :
-                        useInput = True
-            else :
+            proc = optProcs.get(arg[1])
+            if proc is None :
                 raise BadOptionException(arg)
-
+            proc(arg)
         except BadOptionException as a :
             print('Unrecognized option', arg)
-            exit(1)
+            sys.exit(1)
 
 if aOpt != A_REN and pOpt == 0 : pOpt = 1
 if caMerge and caPunPos == 1 : caPunPos = 2 # See avoid function.
 
+# The -F exclude namespecs and the -R directory list are fixed for the whole
+# run, so each is combined here into one compiled regex (the translated
+# patterns joined by |) instead of calling fnmatch.fnmatch per pattern per
+# name in the per-file loops. fnmatch normcases both sides, which only has an
+# effect under case-insensitive Windows, so IGNORECASE reproduces it there.
+# Besides collapsing N pattern walks into one, this sidesteps fnmatch's
+# per-call normcase and compiled-pattern cache lookup entirely. Translated
+# namespecs are simple alternations with no nested quantifiers, so the
+# backtracking engine matches them in effectively linear time and a DFA
+# library (google-re2) would add a third-party dependency for no gain.
+fexcPat = None
+if len(fOpt) != 0 :
+    fexcPat = re.compile('|'.join(fnmatch.translate(p) for p in fOpt),
+    re.IGNORECASE if Windows else 0)
+rDirsPat = None
+if len(rDirs) != 0 :
+    rDirsPat = re.compile('|'.join(fnmatch.translate(p) for p in rDirs),
+    re.IGNORECASE if Windows else 0)
+
 if len(sOpt) == 0 and argc < 3 :
     print(r'Filter and replacement are required unless -U or -S option.')
-    exit(1)
+    sys.exit(1)
 if len(sOpt) != 0 :
-    pass
+# The -S rules are fixed for the run, so runs of consecutive character rules
+# are composed here into translation tables, turning the per-file work into
+# one str.translate pass per run instead of one str.replace pass per rule.
+# Composition preserves the sequential semantics: a new rule s>d first
+# redirects any table entry already producing s (that output would have been
+# substituted again by the later rule) and then maps s itself unless an
+# earlier rule already consumes it. U and L operate on the whole name between
+# substitutions, so each one ends the current run. Mapping a character to
+# None deletes it, matching the x>x delete idiom of str.replace with "".
+# Collapsing further to one table plus trailing case flags would be wrong:
+# rules given after a U or L are written against the case-shifted name and
+# must not be applied before the shift.
+    sProg = []
+    table = None
+    for sop in sOpt :
+        if sop.upper() in ('U', 'L') :
+            table = None
+            sProg.append(sop.upper())
+        elif len(sop) == 2 :
+            s = sop[0]
+            d = sop[1] if sop[0] != sop[1] else None
+            if table is None :
+                table = {}
+                sProg.append(table)
+            for k, v in table.items() :
+                if v == s :
+                    table[k] = d
+            if s not in table :
+                table[s] = d
+    sProg = [op if type(op) is str else str.maketrans(op) for op in sProg]
 elif eOpt :
     filter = re.compile(sys.argv[1], filterCase)
 else : # Native filter-replacement-rules.
@@ -1109,20 +1337,20 @@ else : # Native filter-replacement-rules.
 # is reported as an error.
         if filArg.count('?') < len(filArgx) :
             print('The filter extension contains more elements than ?s in the filter.')
-            exit(1)
+            sys.exit(1)
     
     aRep = sys.argv[2]
     # Check filter and replacement generally for illegal characters.
     try :
-        badChr(r'[<>|",\\;:/]', filArg ) # Illegal file chars except * and ?
-        badChr(r'[<>|",\\;]', aRep )
+        badChr('<>|",\\;:/', filArg ) # Illegal file chars except * and ?
+        badChr('<>|",\\;', aRep )
     except ValueError :
-        exit(1)
+        sys.exit(1)
 # The filter may contain any number of *s but none adjacent to each other, as 
 # it would be impossible to determine their internal boundary. 
     if filArg.find(r'**') >= 0 :
         print('Illegal adjacent *s in', filArg)
-        exit(1)
+        sys.exit(1)
 # There is no boundary ambiguity for ? when the width is either the default 1
 # or specified as anything other than 0, which means zero or any number of
 # characters. This cannot be determined without coordinated analysis of 
@@ -1159,18 +1387,22 @@ else : # Native filter-replacement-rules.
         maxFloat = 0
     elif filArg[-1] == '.' :
         filArg = filArg[:-1]
-    filRe = ""
-    filxIdx = 0
+    filRe = [] # Pattern fragments, joined once at compile; += on a string
+# would reallocate the whole buffer for every character of the filter.
+    filxIdx = 0 # Next unconsumed filter extension element.
+    fxRules = [] # Parsed semantic rules; becomes the new filArgx. Appending
+# here replaces the old in-place rewrite of filArgx, whose del of each
+# width-only element shifted the remainder of the list.
     for c in filArg :
         if c == '.' :
-            filRe += r'\.'
+            filRe.append(r'\.')
         elif c == '*' :
             maxFloat += 1
-            filRe += '(.*?)'
+            filRe.append('(.*?)')
         elif c == '?' :
             maxFloat += 1
             if filxIdx >= len(filArgx) :
-                filRe += '(.)' # Default ? means any one character.
+                filRe.append('(.)') # Default ? means any one character.
             else :
 # The canonic filter extension is /width,filter, which can be split on ','. 
 # Width is either a single number or a range m-n. Initially, value range is 
@@ -1183,31 +1415,32 @@ else : # Native filter-replacement-rules.
 # /,filter can also be interpreted as 0 width. These small reductions can 
 # emphasize the purpose by de-emphasizing don't care parameters.
 #
-# Split the rule into field width and filter criteria. If it only specifies 
-# width then it can be converted to RE and deleted. Otherwise, the rule is 
-# changed from one string to a tuple containing the associated floater index 
-# and the filter criteria descriptor. In the end, filArgx is a condensed list 
-# of semantic rules tagged with the floater index to which they apply. Note 
+# Split the rule into field width and filter criteria. If it only specifies
+# width then it is converted to RE and contributes nothing further. Otherwise
+# a tuple of the associated floater index and the filter criteria descriptor
+# is appended to fxRules, which replaces filArgx in the end as the condensed
+# list of semantic rules tagged with the floater index they apply to. Note
 # that these indices start at 1 because they will be used to select groups 
 # after re.match, where group 0 is the entire file name.
                 fidx = 2 # rule[2] is filter for canonical case m,n,filter
                 rule = filArgx[filxIdx].split(',')
+                filxIdx += 1
                 if rule == [""] : # Empty placeholder // = /1/
-                    filRe += '(.)'
+                    filRe.append('(.)')
                 elif rule[0].isnumeric() : # width
                     if len(rule) > 1 and rule[1].isnumeric() : # min,max width range
-                        filRe += '(.{' + rule[0] + ',' + rule[1] + '})' # (.{m,n})
+                        filRe.append('(.{' + rule[0] + ',' + rule[1] + '})') # (.{m,n})
                     else :
                         fidx = 1
                         if rule[0] == '0' :
-                            filRe += '(.*?)' # non-greedy any width.
+                            filRe.append('(.*?)') # non-greedy any width.
                         else :
-                            filRe += '(.{' + rule[0] + '})' # (.{m})
+                            filRe.append('(.{' + rule[0] + '})') # (.{m})
                 else : # Non-empty and non-numeric must be filter without width.
                     fidx = 0 
-                    filRe += '(.*?)' # Default width.
-                if fidx >= len(rule) : # No filter argument
-                    del(filArgx[filxIdx])
+                    filRe.append('(.*?)') # Default width.
+                if fidx >= len(rule) : # No filter argument; width-only
+                    pass                # elements contribute only to the RE.
                 else :
                     rule = rule[fidx]
                     rang = rule.split('-')
@@ -1220,18 +1453,32 @@ else : # Native filter-replacement-rules.
                                 rule = (FX_NRANGE, int(rang[0][1:]), int(rang[1]))
                             except ValueError :
                                 print(rule, 'Incorrect numeric range')
-                                exit(1)
+                                sys.exit(1)
                         else :
                             rule = (FX_ARANGE, rang[0], rang[1])
                     else :
                         print('Unrecognized semantic filter rule', rule)
-                        exit(1)
-                    filArgx[filxIdx] = (maxFloat + 1, rule)
-                    filxIdx += 1
+                        sys.exit(1)
+# Flattened to (group index, type, low, high) so native unpacks each rule
+# in its loop header instead of indexing a nested tuple per file.
+                    fxRules.append((maxFloat + 1,) + rule)
         else :
-            filRe += c
-    filRe += fadd + '$'        
-    filter = re.compile(filRe, filterCase)
+            filRe.append(c)
+    filArgx = fxRules
+    filRe.append(fadd + '$')
+    filter = re.compile(''.join(filRe), filterCase)
+
+# First-stage sieve. Most filters begin with a literal anchor (e.g. my*) and
+# a plain startswith test rejects non-matching names far more cheaply than
+# entering the regex engine in native(). The prefix is everything before the
+# first floater, lower-cased when the filter is case-insensitive. An empty
+# prefix (filter begins with a floater) disables the sieve.
+    idx = len(filArg)
+    for c in '*?' :
+        i = filArg.find(c)
+        if i >= 0 and i < idx :
+            idx = i
+    filPfx = filArg[:idx].lower() if filterCase else filArg[:idx]
 
 # If the order option (-O) redefines the floater source order, it must not 
 # specify any index greater than maxFloat. If it doesn't specify all of them, 
@@ -1244,33 +1491,36 @@ else : # Native filter-replacement-rules.
         for idx in oOpt : 
             if idx > maxFloat :
                 print('Order option index', idx, '> maximum index', maxFloat)
-                exit(1)
-        missing = maxFloat + 1 - len(oOpt)
-        for idx in range(0, maxFloat + 1) :
-            if missing < 0 :
-                break
-            if idx in oOpt :
-                continue
-            oOpt.append(idx)
-            missing -= 1
-
-# split the replacement argument on single-char variables and remove all of 
+                sys.exit(1)
+        oSet = set(oOpt) # O(1) membership; a list scan would make this O(n^2).
+        tail = [idx for idx in range(maxFloat + 1) if idx not in oSet]
+# The slice bound reproduces the old missing-counter loop exactly, including
+# its behavior when the user duplicates indices: at most one more index than
+# the count of unfilled slots is appended.
+        oOpt.extend(tail[:maxFloat + 2 - len(oOpt)])
+
+# split the replacement argument on single-char variables and remove all of
 # the empty strings resulting from leading, trailing and adjacent variables.
-    lrep = [v for v in re.split(r'([' + rvars + r'])', aRep) if v != ""]
+# This whole parse block runs once per process (recursion re-walks
+# directories, not the command line), so the split pattern gains nothing
+# from a module-level precompile; re's internal cache covers its single use.
+    lrep = [v for v in re.split(r'([' + rvars + r'])', aRep) if v]
 
-# Find the index of the last floater consumer in the replacement list. If 
+# Find the index of the last floater consumer in the replacement list. If
 # there are more floaters than consumers, the extras will be given to the last
-# consumer as each file is processed.
-    lastConsumer = -1
-    for i,v in enumerate(lrep) :
-        if v in consumers :
+# consumer as each file is processed. Scanning from the right stops at the
+# first consumer instead of walking the whole list to remember the last one.
+    maxConsumer = -1 # Remains -1 if the replacement has no consumers.
+    for i in range(len(lrep) - 1, -1, -1) :
+        if lrep[i] in consumerSet :
             maxConsumer = i
+            break
 
 # Create a condensed tuple of replacement variables that require rules. This
 # is used only for checking the rules as they are parsed and to verify that
 # the number of rule arguments and rule consumers in the replacement are equal.
 
-    rulevars = tuple(rep for rep in lrep if rep == rvRule or rep == rvAdd)
+    rulevars = tuple([rep for rep in lrep if rep in ruledSet])
 
 # Rules  are all arguments after filter and replacement. Rules typically are 
 # all declared in one group followed by options but they may be mixed and in 
@@ -1281,38 +1531,42 @@ else : # Native filter-replacement-rules.
     rvIdx = 0 # rule variable index.
     if argc > 3 :
         for arg in sys.argv[3:] :
-            if arg[0] != '-' : # rule is any arg without - prefix
-                try :
-                    if len(rulevars) <= rvIdx :
-                        print('More rules than specified in the replacement')
-                        exit(1)
-                    rules.append(prepRule(arg, repRules[arg[0]], rulevars[rvIdx]))
-                    if rules[rvIdx][0] == 'I' :
-                        irules.append(rvIdx) # In case of recursion with reload.
-                    rvIdx += 1
-                except KeyError :
+            if arg[:1] != '-' : # rule is any arg without - prefix
+                if len(rulevars) <= rvIdx :
+                    print('More rules than specified in the replacement')
+                    sys.exit(1)
+                defRule = repRules.get(arg[0])
+                if defRule is None :
                     print('Unrecognized rule', arg)
-                    exit(1)
+                    sys.exit(1)
+                try :
+                    rules.append(prepRule(arg, defRule, rulevars[rvIdx]))
                 except ValueError :
-                    exit(1)
+                    sys.exit(1)
+                if rules[rvIdx][0] == 'I' :
+                    irules.append(rvIdx) # In case of recursion with reload.
+                rvIdx += 1
 
     nRules = len(rules)
 
     if nRules < len(rulevars) :
         print(aRep, ' contains ', len(rulevars), ' rule-based variables (',
               rvRule, rvAdd, ') but only ', nRules, ' is/are defined', sep = "")
-        exit(1)
+        sys.exit(1)
 
     if not Windows and len(irules) != 0 and sortdir == 0 :
         sortdir = 1
         
 if rDepth == 0 :
-    exit(procDir())
-ret = procTree()
-with open('reneActr', 'wt') as rf :
-    for dir in rVisit :
-        rf.write(dir + '\n')
-exit(ret)
+    sys.exit(procDir())
+ret = procTree(os.getcwd())
+# One joined write instead of a small write per visited directory. The file
+# is not created at all unless some directory was visited, sparing the
+# create/close syscall pair when recursion found nothing.
+if len(rVisit) != 0 :
+    with open('reneActr', 'wt') as rf :
+        rf.write('\n'.join(rVisit) + '\n')
+sys.exit(ret)
 
  
         